@@ -12,13 +12,56 @@ from datetime import datetime, timezone
 from email.mime.text import MIMEText
 from typing import Any, Dict
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 _last_alert_times = {}
 
+# Shared HTTP session so repeated Slack alerts reuse the same connection
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_maxsize=2))
+
+
+# Map metric names to units
+METRIC_UNITS = {
+    "cpu": "%",
+    "memory": "%",
+    "disk": "%",
+    "cpu_usage": "%",
+    "memory_usage": "%",
+    "disk_usage": "%",
+    "used_gb": "GB",
+    "free_gb": "GB",
+    "total_gb": "GB",
+}
+
+# Metrics that support alerting, mapped to their threshold key in config
+_THRESHOLD_KEYS = {
+    "cpu": "cpu_threshold",
+    "memory": "memory_threshold",
+    "disk": "disk_threshold",
+}
+
+
+def build_threshold_map(alerting: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Build a metric -> threshold map from the alerting config section.
+    e.g. {'cpu_threshold': 90} becomes {'cpu': 90}.
+    Metrics without a configured threshold are left out.
+    """
+    return {
+        metric: alerting[key]
+        for metric, key in _THRESHOLD_KEYS.items()
+        if alerting.get(key) is not None
+    }
+
 
 def check_thresholds(
-    metrics: Dict[str, float], config: Dict[str, Any], context: dict = None
+    metrics: Dict[str, float],
+    config: Dict[str, Any],
+    context: dict = None,
+    thresholds: Dict[str, float] = None,
 ):
     """
     Check metrics against thresholds and trigger alerts if needed.
@@ -26,10 +69,23 @@ def check_thresholds(
         metrics: Dict of metric name to value (e.g., {'cpu': 95.0})
         config: Parsed config dict
         context: Optional dict with extra info (e.g., hostname)
+        thresholds: Optional precomputed map from build_threshold_map();
+            built from config when omitted
     """
     import socket
 
     alerting = config.get("alerting", {})
+    if thresholds is None:
+        thresholds = build_threshold_map(alerting)
+    # Common case: nothing is over its threshold, so skip the hostname
+    # lookup and message building entirely
+    exceeded = [
+        (metric, value, thresholds[metric])
+        for metric, value in metrics.items()
+        if metric in thresholds and value > thresholds[metric]
+    ]
+    if not exceeded:
+        return
     cooldown = alerting.get("cooldown_seconds", 600)
     now = time.time()
     hostname = None
@@ -40,41 +96,27 @@ def check_thresholds(
             hostname = socket.gethostname()
         except Exception:
             hostname = "unknown"
-    # Map metric names to units
-    metric_units = {
-        "cpu": "%",
-        "memory": "%",
-        "disk": "%",
-        "cpu_usage": "%",
-        "memory_usage": "%",
-        "disk_usage": "%",
-        "used_gb": "GB",
-        "free_gb": "GB",
-        "total_gb": "GB",
-    }
-    for metric, value in metrics.items():
-        threshold = alerting.get(f"{metric}_threshold")
-        unit = metric_units.get(metric, "")
-        value_str = f"{value} {unit}" if unit else str(value)
-        threshold_str = f"{threshold} {unit}" if unit else str(threshold)
-        if threshold is not None and value > threshold:
-            last_time = _last_alert_times.get(metric, 0)
-            if now - last_time > cooldown:
-                timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S %Z")
-                msg = (
-                    f"*🚨 SRE Alert: {metric.upper()} threshold exceeded!*\n"
-                    f"> *Device:* `{hostname}`\n"
-                    f"> *Metric:* `{metric}`\n"
-                    f"> *Value:* `{value_str}`\n"
-                    f"> *Threshold:* `{threshold_str}`\n"
-                    f"> *Time:* `{timestamp}`\n"
-                )
-                if context:
-                    for k, v in context.items():
-                        if k != "hostname":
-                            msg += f"> *{k.capitalize()}:* `{v}`\n"
-                send_alert(msg, alerting)
-                _last_alert_times[metric] = now
+    for metric, value, threshold in exceeded:
+        last_time = _last_alert_times.get(metric, 0)
+        if now - last_time > cooldown:
+            unit = METRIC_UNITS.get(metric, "")
+            value_str = f"{value} {unit}" if unit else str(value)
+            threshold_str = f"{threshold} {unit}" if unit else str(threshold)
+            timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S %Z")
+            msg = (
+                f"*🚨 SRE Alert: {metric.upper()} threshold exceeded!*\n"
+                f"> *Device:* `{hostname}`\n"
+                f"> *Metric:* `{metric}`\n"
+                f"> *Value:* `{value_str}`\n"
+                f"> *Threshold:* `{threshold_str}`\n"
+                f"> *Time:* `{timestamp}`\n"
+            )
+            if context:
+                for k, v in context.items():
+                    if k != "hostname":
+                        msg += f"> *{k.capitalize()}:* `{v}`\n"
+            send_alert(msg, alerting)
+            _last_alert_times[metric] = now
 
 
 def send_alert(message: str, alerting: Dict[str, Any]):
@@ -111,7 +153,12 @@ def send_slack_alert(message: str, slack_cfg: Dict[str, Any]):
     """
     try:
         payload = {"text": message}
-        resp = requests.post(slack_cfg["webhook_url"], json=payload, timeout=5)
+        resp = _session.post(
+            slack_cfg["webhook_url"],
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=5,
+        )
         if resp.status_code != 200:
             logging.error(f"Slack alert failed: {resp.text}")
     except Exception as e:
@@ -1,13 +1,16 @@
-import json
 import logging
 import os
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import psutil
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
+from monitor_service.utils import JSONLogFormatter
+
 API_VERSION = "1.0.0"
 
 app = FastAPI(
@@ -23,6 +26,18 @@ class MetricsPayload(BaseModel):
     metrics: Dict[str, Any] = Field(..., description="System metrics")
 
 
+class MetricsAckResponse(BaseModel):
+    status: str = Field(..., description="Ingestion status")
+    received_at: str = Field(..., description="UTC ISO timestamp of receipt")
+    hostname: str = Field(..., description="Hostname of the sender")
+
+
+class MetricsBatchAckResponse(BaseModel):
+    status: str = Field(..., description="Ingestion status")
+    received_at: str = Field(..., description="UTC ISO timestamp of receipt")
+    count: int = Field(..., description="Number of payloads received")
+
+
 class HealthResponse(BaseModel):
     status: str = Field(..., description="Health status")
     timestamp: str = Field(..., description="UTC ISO timestamp")
@@ -36,18 +51,6 @@ class DetailedHealthResponse(HealthResponse):
     disk_usage: Dict[str, Any] = Field(..., description="Disk usage statistics")
 
 
-class JSONLogFormatter(logging.Formatter):
-    def format(self, record):
-        log_record = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "level": record.levelname,
-            "message": record.getMessage(),
-        }
-        if isinstance(record.msg, dict):
-            log_record.update(record.msg)
-        return json.dumps(log_record)
-
-
 logger = logging.getLogger("CloudIngestion")
 logger.setLevel(logging.INFO)
 handler = logging.StreamHandler()
@@ -55,9 +58,37 @@ handler.setFormatter(JSONLogFormatter())
 if not logger.hasHandlers():
     logger.addHandler(handler)
 
+# Host identity does not change while the service runs
+_UNAME = os.uname()
+
 # Track startup time for uptime calculation
 startup_time = datetime.now(timezone.utc)
 
+# Prime psutil's CPU counters so the detailed health check can sample
+# without blocking (each call measures the delta since the previous one).
+psutil.cpu_percent(interval=None)
+
+# Probe endpoints share one timestamp/uptime snapshot, refreshed at most
+# every HEALTH_CACHE_TTL seconds.
+HEALTH_CACHE_TTL = 0.5
+_health_cache = {"refreshed_at": float("-inf"), "payload": None}
+
+
+def _health_payload() -> Dict[str, Any]:
+    """
+    Return the cached timestamp/version/uptime fields for health responses.
+    """
+    now_mono = time.monotonic()
+    if now_mono - _health_cache["refreshed_at"] > HEALTH_CACHE_TTL:
+        now = datetime.now(timezone.utc)
+        _health_cache["payload"] = {
+            "timestamp": now.isoformat(),
+            "version": API_VERSION,
+            "uptime": (now - startup_time).total_seconds(),
+        }
+        _health_cache["refreshed_at"] = now_mono
+    return _health_cache["payload"]
+
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -65,13 +96,7 @@ async def health_check():
     Basic health check endpoint.
     Returns 200 if the service is running.
     """
-    uptime = (datetime.now(timezone.utc) - startup_time).total_seconds()
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now(timezone.utc).isoformat(),
-        version=API_VERSION,
-        uptime=uptime,
-    )
+    return {"status": "healthy", **_health_payload()}
 
 
 @app.get("/health/ready", response_model=HealthResponse)
@@ -80,13 +105,7 @@ async def readiness_check():
     Readiness check endpoint.
     Returns 200 if the service is ready to accept requests.
     """
-    uptime = (datetime.now(timezone.utc) - startup_time).total_seconds()
-    return HealthResponse(
-        status="ready",
-        timestamp=datetime.now(timezone.utc).isoformat(),
-        version=API_VERSION,
-        uptime=uptime,
-    )
+    return {"status": "ready", **_health_payload()}
 
 
 @app.get("/health/live", response_model=HealthResponse)
@@ -95,13 +114,43 @@ async def liveness_check():
     Liveness check endpoint.
     Returns 200 if the service is alive and responsive.
     """
-    uptime = (datetime.now(timezone.utc) - startup_time).total_seconds()
-    return HealthResponse(
-        status="alive",
-        timestamp=datetime.now(timezone.utc).isoformat(),
-        version=API_VERSION,
-        uptime=uptime,
-    )
+    return {"status": "alive", **_health_payload()}
+
+
+def _collect_detailed_health():
+    """
+    Gather system, memory and disk information for the detailed health check.
+    Runs in a worker thread so blocking psutil calls stay off the event loop.
+    """
+    # Get system information
+    system_info = {
+        "hostname": _UNAME.nodename,
+        "platform": _UNAME.sysname,
+        "release": _UNAME.release,
+        "version": _UNAME.version,
+        "machine": _UNAME.machine,
+        "cpu_count": psutil.cpu_count(),
+        "cpu_percent": psutil.cpu_percent(interval=None),
+    }
+
+    # Get memory information
+    memory = psutil.virtual_memory()
+    memory_usage = {
+        "total_gb": round(memory.total / (1024**3), 2),
+        "available_gb": round(memory.available / (1024**3), 2),
+        "used_gb": round(memory.used / (1024**3), 2),
+        "percent": memory.percent,
+    }
+
+    # Get disk information
+    disk = psutil.disk_usage("/")
+    disk_usage = {
+        "total_gb": round(disk.total / (1024**3), 2),
+        "used_gb": round(disk.used / (1024**3), 2),
+        "free_gb": round(disk.free / (1024**3), 2),
+        "percent": disk.percent,
+    }
+    return system_info, memory_usage, disk_usage
 
 
 @app.get("/health/detailed", response_model=DetailedHealthResponse)
@@ -111,40 +160,16 @@ async def detailed_health_check():
     Returns comprehensive system information and health status.
     """
     try:
-        # Get system information
-        system_info = {
-            "hostname": os.uname().nodename,
-            "platform": os.uname().sysname,
-            "release": os.uname().release,
-            "version": os.uname().version,
-            "machine": os.uname().machine,
-            "cpu_count": psutil.cpu_count(),
-            "cpu_percent": psutil.cpu_percent(interval=1),
-        }
-
-        # Get memory information
-        memory = psutil.virtual_memory()
-        memory_usage = {
-            "total_gb": round(memory.total / (1024**3), 2),
-            "available_gb": round(memory.available / (1024**3), 2),
-            "used_gb": round(memory.used / (1024**3), 2),
-            "percent": memory.percent,
-        }
-
-        # Get disk information
-        disk = psutil.disk_usage("/")
-        disk_usage = {
-            "total_gb": round(disk.total / (1024**3), 2),
-            "used_gb": round(disk.used / (1024**3), 2),
-            "free_gb": round(disk.free / (1024**3), 2),
-            "percent": disk.percent,
-        }
+        system_info, memory_usage, disk_usage = await run_in_threadpool(
+            _collect_detailed_health
+        )
 
-        uptime = (datetime.now(timezone.utc) - startup_time).total_seconds()
+        now = datetime.now(timezone.utc)
+        uptime = (now - startup_time).total_seconds()
 
         return DetailedHealthResponse(
             status="healthy",
-            timestamp=datetime.now(timezone.utc).isoformat(),
+            timestamp=now.isoformat(),
             version=API_VERSION,
             uptime=uptime,
             system_info=system_info,
@@ -170,24 +195,56 @@ async def root():
             "liveness": "/health/live",
             "detailed_health": "/health/detailed",
             "metrics": "/api/metrics",
+            "metrics_batch": "/api/metrics/batch",
             "docs": "/docs",
         },
     }
 
 
-@app.post("/api/metrics")
+@app.post("/api/metrics", response_model=MetricsAckResponse)
 async def receive_metrics(payload: MetricsPayload, request: Request):
     """
     Receive system metrics as JSON payload and log them in structured format.
     """
-    log_data = payload.model_dump()
-    log_data["client_host"] = request.client.host
-    logger.info({"event": "metrics_received", **log_data})
-    return {
-        "status": "ok",
-        "received_at": datetime.now(timezone.utc).isoformat(),
-        "hostname": payload.hostname,
-    }
+    # Log the validated fields directly rather than copying via model_dump()
+    logger.info(
+        {
+            "event": "metrics_received",
+            "timestamp": payload.timestamp,
+            "hostname": payload.hostname,
+            "metrics": payload.metrics,
+            "client_host": request.client.host,
+        }
+    )
+    return MetricsAckResponse(
+        status="ok",
+        received_at=datetime.now(timezone.utc).isoformat(),
+        hostname=payload.hostname,
+    )
+
+
+@app.post("/api/metrics/batch", response_model=MetricsBatchAckResponse)
+async def receive_metrics_batch(payloads: List[MetricsPayload], request: Request):
+    """
+    Receive several metrics payloads in one request, as sent by collectors
+    with cloud.batch_size > 1, and log each in structured format.
+    """
+    client_host = request.client.host
+    for payload in payloads:
+        logger.info(
+            {
+                "event": "metrics_received",
+                "timestamp": payload.timestamp,
+                "hostname": payload.hostname,
+                "metrics": payload.metrics,
+                "client_host": client_host,
+            }
+        )
+    return MetricsBatchAckResponse(
+        status="ok",
+        received_at=datetime.now(timezone.utc).isoformat(),
+        count=len(payloads),
+    )
 
 
 if __name__ == "__main__":
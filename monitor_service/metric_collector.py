@@ -5,20 +5,139 @@ Collects CPU, memory, and disk metrics using psutil.
 Provides a method to periodically print these metrics.
 """
 
-import json
+import asyncio
+import functools
 import logging
+import os
+import queue
+import random
 import socket
+import threading
 import time
 from datetime import datetime, timezone
 from typing import Any, Dict
 
+import orjson
 import psutil
 import requests
 from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.client.write_api import WriteOptions
+from requests.adapters import HTTPAdapter
 
 from monitor_service import alerts  # Import alerting module
-from monitor_service.utils import load_config
+from monitor_service.utils import JSONLogFormatter, load_config
+
+# Bytes -> GB factor; a power of two, so multiplying is exact
+INV_GB = 2**-30
+
+# Sentinel telling a background consumer (the sender, or the shipping loop
+# fed by the sampler thread) to flush and exit
+_STOP = object()
+
+# Logical CPU count, fixed for the life of the process
+CPU_COUNT = os.cpu_count() or psutil.cpu_count(logical=True)
+
+# Pseudo filesystems skipped when collecting disk usage. "overlay" is kept
+# because it is the root filesystem inside containers.
+IGNORED_FSTYPES = frozenset({"tmpfs", "devtmpfs", "squashfs", "autofs"})
+
+
+def _disk_usage(mountpoint: str):
+    """
+    Return (total, used, free, percent) bytes for a mountpoint from a single
+    os.statvfs() call. Same fields as psutil.disk_usage(): `free` is space
+    available to unprivileged users and percent excludes reserved blocks.
+    """
+    st = os.statvfs(mountpoint)
+    total = st.f_blocks * st.f_frsize
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    free = st.f_bavail * st.f_frsize
+    total_user = used + free
+    percent = round(used * 100.0 / total_user, 1) if total_user else 0.0
+    return total, used, free, percent
+
+
+# Per-core cpu_times() record type, reused for the direct /proc/stat reader
+_CPUTimes = type(psutil.cpu_times())
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+# Kept-open /proc/stat descriptor and its read size, see _percpu_cpu_times()
+_proc_stat_fd = None
+_PROC_STAT_READ_SIZE = 1 << 16
+
+
+def _percpu_cpu_times():
+    """
+    Per-core cpu_times() read straight from /proc/stat.
+
+    The file is opened once and re-read with os.pread() each call, skipping
+    psutil's open/decode/close round trip. Values are converted to seconds
+    like psutil's. Falls back to psutil.cpu_times(percpu=True) where
+    /proc/stat is unavailable.
+    """
+    global _proc_stat_fd
+    if _proc_stat_fd is None:
+        try:
+            _proc_stat_fd = os.open("/proc/stat", os.O_RDONLY)
+        except OSError:
+            _proc_stat_fd = -1
+    if _proc_stat_fd < 0:
+        return psutil.cpu_times(percpu=True)
+
+    data = os.pread(_proc_stat_fd, _PROC_STAT_READ_SIZE, 0)
+    nfields = len(_CPUTimes._fields)
+    per_core = []
+    # The first line is the aggregate "cpu"; per-core "cpuN" lines follow
+    for line in data.split(b"\n")[1:]:
+        if not line.startswith(b"cpu"):
+            break
+        values = [int(v) / _CLOCK_TICKS for v in line.split()[1 : nfields + 1]]
+        values += [0.0] * (nfields - len(values))
+        per_core.append(_CPUTimes(*values))
+    return per_core
+
+
+def _cpu_busy_percent(prev, cur) -> float:
+    """
+    CPU busy percent between two cpu_times() samples, computed the same
+    way psutil.cpu_percent() does: per-field deltas are clamped at 0 (Linux
+    counters such as iowait can go backwards), idle and iowait count as
+    idle, and guest time is already included in user/nice so it is not
+    added twice. The result is clamped to [0, 100].
+    """
+    delta = {field: max(0, c - p) for field, p, c in zip(cur._fields, prev, cur)}
+    total = sum(delta.values()) - delta.get("guest", 0) - delta.get("guest_nice", 0)
+    if total <= 0:
+        return 0.0
+    busy = total - delta["idle"] - delta.get("iowait", 0)
+    return round(max(0.0, min(busy / total * 100, 100.0)), 1)
+
+
+def _ttl_cached(method):
+    """
+    Memoize a no-argument collector method for `self.cache_ttl` seconds.
+    A TTL of 0 (or None, when unset) disables caching, so every call
+    samples psutil.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self):
+        # Collectors update shared state (the TTL cache, previous CPU times),
+        # so the sampler thread and direct callers take turns
+        with self._collect_lock:
+            ttl = self.cache_ttl
+            if ttl is None or ttl <= 0:
+                return method(self)
+            now = time.monotonic()
+            cached = self._metric_cache.get(name)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+            value = method(self)
+            self._metric_cache[name] = (now + ttl, value)
+            return value
+
+    return wrapper
 
 
 class MetricCollector:
@@ -34,17 +153,112 @@ class MetricCollector:
       - Robust error handling and retries
     """
 
+    __slots__ = (
+        "config",
+        "interval",
+        "cache_ttl",
+        "min_change",
+        "_last_shipped",
+        "_skipped_cycles",
+        "cloud_endpoint",
+        "cloud_api_key",
+        "cloud_batch_size",
+        "_send_queue",
+        "_sender_thread",
+        "cpu_threshold",
+        "memory_threshold",
+        "disk_threshold",
+        "alert_thresholds",
+        "logger",
+        "_metric_cache",
+        "_hostname",
+        "_http",
+        "_influx_client",
+        "_influx_write",
+        "_partitions_cache",
+        "_point_builders",
+        "_latest",
+        "_latest_lock",
+        "_handoff",
+        "_collect_lock",
+        "_stop_event",
+        "_shutdown",
+        "_collector_thread",
+        "_processes",
+        "_prev_cpu_times",
+    )
+
+    # Seconds between refreshes of the mounted partition list
+    PARTITIONS_TTL = 60
+    # Retry backoff: base * 2**(attempt-1), capped, plus random jitter
+    RETRY_BASE_DELAY = 2
+    RETRY_MAX_DELAY = 10
+    RETRY_JITTER = 0.5
+    # Longest run of unchanged samples skipped before one is shipped anyway
+    MAX_SKIPPED_CYCLES = 5
+    # Payloads buffered for the background sender before new ones are dropped
+    SEND_QUEUE_MAXSIZE = 100
+
     def __init__(self, config_path: str = "config.yaml"):
         self.config = load_config(config_path)
         self.interval = self.config.get("metrics", {}).get("interval")
+        # Seconds collector results are reused; 0 means sample on every call.
+        # None (unset) defaults to just under the interval while monitoring.
+        self.cache_ttl = self.config.get("metrics", {}).get("cache_ttl")
+        self._metric_cache = {}
+        # Minimum percent-point change needed to ship a sample; 0 ships all
+        self.min_change = self.config.get("metrics", {}).get("min_change", 0)
+        self._last_shipped = None
+        self._skipped_cycles = 0
         self.cloud_endpoint = self.config.get("cloud", {}).get("endpoint", "")
         self.cloud_api_key = self.config.get("cloud", {}).get("api_key", "")
+        # Payloads per POST; above 1, sends go through a background sender
+        self.cloud_batch_size = self.config.get("cloud", {}).get("batch_size", 1)
+        self._send_queue = queue.Queue(maxsize=self.SEND_QUEUE_MAXSIZE)
+        self._sender_thread = None
         self.cpu_threshold = self.config.get("alerting", {}).get("cpu_threshold", 90)
         self.memory_threshold = self.config.get("alerting", {}).get(
             "memory_threshold", 80
         )
         self.disk_threshold = self.config.get("alerting", {}).get("disk_threshold", 80)
+        # Metric -> threshold map handed to the alerting module each cycle
+        self.alert_thresholds = alerts.build_threshold_map(
+            self.config.get("alerting", {})
+        )
         self.logger = self._setup_logger()
+        self._hostname = socket.gethostname()
+        # Reuse one HTTP session so metric pushes keep the connection alive
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
+        # InfluxDB client and batching write API, created on first write
+        self._influx_client = None
+        self._influx_write = None
+        # (refreshed_at, mountpoints) from the last psutil.disk_partitions()
+        self._partitions_cache = (0.0, [])
+        # InfluxDB point builders keyed by metric shape, see _format_point
+        self._point_builders = {}
+        # Background sampling state, see start_collector(). Each sample is
+        # handed to the shipping loop through a one-slot queue.
+        self._latest = None
+        self._latest_lock = threading.Lock()
+        self._handoff = queue.Queue(maxsize=1)
+        # Held while collecting; re-entrant so collect_all() can hold it
+        # across the individual collectors
+        self._collect_lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._collector_thread = None
+        # Set by stop() and never cleared, so a stop requested before or
+        # while monitor_periodically starts up is not lost
+        self._shutdown = threading.Event()
+        # Per-core CPU times from the previous sample; usage is computed
+        # from the delta, so collection never sleeps for a window.
+        self._prev_cpu_times = _percpu_cpu_times()
+        # Long-lived Process handles keyed by pid; psutil keeps the CPU-time
+        # state for cpu_percent() on the handle, so each is primed once
+        self._processes = {}
+        self._get_process(os.getpid())
 
     def _setup_logger(self):
         logger = logging.getLogger("MetricCollector")
@@ -55,60 +269,142 @@ class MetricCollector:
             logger.addHandler(handler)
         return logger
 
+    @_ttl_cached
     def collect_cpu_metrics(self) -> Dict[str, Any]:
         """
         Collect basic CPU metrics.
-        Returns a dictionary with CPU usage, count, per-core usage
+        Returns a dictionary with CPU usage, count, per-core usage.
+        Usage is measured since the previous call (non-blocking); the
+        monitoring interval provides the sampling window. The aggregate is
+        the mean of the per-core values, so /proc/stat is read once.
         """
+        cpu_times = _percpu_cpu_times()
+        per_core = [
+            _cpu_busy_percent(prev, cur)
+            for prev, cur in zip(self._prev_cpu_times, cpu_times)
+        ]
+        self._prev_cpu_times = cpu_times
         return {
-            "cpu_usage": psutil.cpu_percent(interval=1),
-            "cpu_count": psutil.cpu_count(logical=True),
-            "per_core_usage": psutil.cpu_percent(interval=1, percpu=True),
+            "cpu_usage": sum(per_core) / len(per_core) if per_core else 0.0,
+            "cpu_count": CPU_COUNT,
+            "per_core_usage": per_core,
         }
 
+    @_ttl_cached
     def collect_memory_metrics(self) -> Dict[str, Any]:
         """
         Collect basic memory metrics.
         Returns a dictionary with total, used, free memory
-        (in GB, rounded to 2 decimal places), and percent used.
+        (in GB, full precision), and percent used.
         """
         mem = psutil.virtual_memory()
-        gb = 1024**3
-        # GB values are rounded to 2 decimal places for readability
+        inv_gb = INV_GB
         return {
-            "total_gb": round(mem.total / gb, 2),
-            "used_gb": round(mem.used / gb, 2),
-            "free_gb": round(mem.free / gb, 2),
+            "total_gb": mem.total * inv_gb,
+            "used_gb": mem.used * inv_gb,
+            "free_gb": mem.free * inv_gb,
             "percent": mem.percent,
         }
 
+    def _get_process(self, pid: int) -> psutil.Process:
+        """
+        Return the cached Process handle for `pid`, creating and priming it
+        on first use.
+        """
+        proc = self._processes.get(pid)
+        if proc is None:
+            proc = psutil.Process(pid)
+            proc.cpu_percent(interval=None)
+            self._processes[pid] = proc
+        return proc
+
+    def collect_process_metrics(self, pid: int = None) -> Dict[str, Any]:
+        """
+        Collect CPU, memory and thread metrics for a single process.
+        Defaults to the collector's own process. Handles are kept per pid,
+        so cpu_percent covers the time since the previous call for that pid
+        (0.0 on the first call for a new pid). The /proc reads are batched
+        with Process.oneshot().
+        """
+        if pid is None:
+            pid = os.getpid()
+        proc = self._get_process(pid)
+        try:
+            with proc.oneshot():
+                return {
+                    "pid": proc.pid,
+                    "cpu_percent": proc.cpu_percent(interval=None),
+                    "rss_gb": proc.memory_info().rss * INV_GB,
+                    "num_threads": proc.num_threads(),
+                }
+        except psutil.NoSuchProcess:
+            # Forget exited processes so a reused pid gets a fresh handle
+            self._processes.pop(pid, None)
+            raise
+
+    def _get_mountpoints(self):
+        """
+        Return mountpoints of real filesystems, re-listing partitions
+        at most once every PARTITIONS_TTL seconds.
+        Only the first mountpoint of each device is kept, so bind mounts
+        don't report (and statvfs) the same filesystem twice.
+        """
+        refreshed_at, mountpoints = self._partitions_cache
+        now = time.monotonic()
+        if not refreshed_at or now - refreshed_at > self.PARTITIONS_TTL:
+            seen_devices = set()
+            mountpoints = []
+            for part in psutil.disk_partitions(all=False):
+                if part.fstype in IGNORED_FSTYPES or part.device in seen_devices:
+                    continue
+                seen_devices.add(part.device)
+                mountpoints.append(part.mountpoint)
+            self._partitions_cache = (now, mountpoints)
+        return mountpoints
+
+    @_ttl_cached
     def collect_disk_metrics(self) -> Dict[str, Any]:
         """
         Collect disk usage metrics for all partitions.
         Returns a dictionary with mountpoints as keys
         and disk usage info as values.
-        GB values are rounded to 2 decimal places.
+        GB values are kept at full precision; round them for display.
         """
         disk_metrics = {}
-        gb = 1024**3
-        for part in psutil.disk_partitions():
+        inv_gb = INV_GB
+        for mountpoint in self._get_mountpoints():
             try:
-                usage = psutil.disk_usage(part.mountpoint)
-                # GB values are rounded to 2 decimal places for readability
-                disk_metrics[part.mountpoint] = {
-                    "total_gb": round(usage.total / gb, 2),
-                    "used_gb": round(usage.used / gb, 2),
-                    "free_gb": round(usage.free / gb, 2),
-                    "percent": usage.percent,
-                }
-            except Exception:
+                total, used, free, percent = _disk_usage(mountpoint)
+            except OSError:
+                # Unmounted or inaccessible since the partition list was cached
                 continue
+            disk_metrics[mountpoint] = {
+                "total_gb": total * inv_gb,
+                "used_gb": used * inv_gb,
+                "free_gb": free * inv_gb,
+                "percent": percent,
+            }
         return disk_metrics
 
+    def collect_all(self) -> Dict[str, Any]:
+        """
+        Collect CPU, memory and disk metrics as one snapshot.
+        Shipping and alerting both consume this dict, so each tick
+        samples psutil once.
+        """
+        with self._collect_lock:
+            return {
+                "cpu": self.collect_cpu_metrics(),
+                "memory": self.collect_memory_metrics(),
+                "disk": self.collect_disk_metrics(),
+            }
+
     def send_metrics(self, metrics: dict) -> None:
         """
         Send metrics to the configured cloud endpoint as a JSON payload.
         Includes timestamp and hostname. Logs success or error.
+        With cloud.batch_size > 1 the payload is queued for the background
+        sender instead, which posts batches to `<endpoint>/batch`.
         """
         if not self.cloud_endpoint:
             self.logger.warning(
@@ -117,40 +413,190 @@ class MetricCollector:
             return
         payload = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
-            "hostname": socket.gethostname(),
+            "hostname": self._hostname,
             "metrics": metrics,
         }
+        if self.cloud_batch_size > 1:
+            self._enqueue_payload(payload)
+            return
+        self._post_payload(self.cloud_endpoint, payload, "metrics_sent")
+
+    def _post_payload(self, url: str, body, event: str) -> None:
+        """
+        POST a JSON body over the shared session and log the outcome.
+        """
         headers = {
             "Content-Type": "application/json",
             "x-api-key": self.cloud_api_key,
         }
         try:
-            response = requests.post(
-                self.cloud_endpoint, json=payload, headers=headers, timeout=5
+            response = self._http.post(
+                url,
+                data=orjson.dumps(body),
+                headers=headers,
+                timeout=5,
             )
             response.raise_for_status()
-            self.logger.info({"event": "metrics_sent", "response": response.json()})
+            self.logger.info({"event": event, "response": response.json()})
         except Exception as e:
             self.logger.error({"event": "send_error", "error": str(e)})
 
+    def _enqueue_payload(self, payload: dict) -> None:
+        """
+        Queue a payload for the background sender, starting it if needed.
+        Drops the payload if the sender has fallen too far behind.
+        """
+        if self._sender_thread is None:
+            self._sender_thread = threading.Thread(
+                target=self._sender_loop, name="MetricCollectorSender", daemon=True
+            )
+            self._sender_thread.start()
+        try:
+            self._send_queue.put_nowait(payload)
+        except queue.Full:
+            self.logger.warning({"event": "send_queue_full", "dropped": 1})
+
+    def _sender_loop(self) -> None:
+        """
+        Background sender: wait for a payload, then keep collecting until
+        cloud.batch_size payloads are queued or batch_size * interval
+        seconds have passed since the first one, and POST them as one JSON
+        array. Exits after flushing once close() queues the stop sentinel.
+        """
+        url = self.cloud_endpoint.rstrip("/") + "/batch"
+        max_delay = self.cloud_batch_size * (self.interval or 1)
+        while True:
+            item = self._send_queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            flush_at = time.monotonic() + max_delay
+            while len(batch) < self.cloud_batch_size:
+                remaining = flush_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._send_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._post_payload(url, batch, "metrics_batch_sent")
+            if stop:
+                return
+
+    def _stop_sender(self) -> None:
+        """
+        Flush queued payloads and stop the background sender if running.
+        """
+        if self._sender_thread is None:
+            return
+        self._send_queue.put(_STOP)
+        self._sender_thread.join(timeout=10)
+        self._sender_thread = None
+
+    def close(self) -> None:
+        """
+        Release network resources held by the collector.
+        Stops the background collector and flushes any InfluxDB points
+        still buffered by the batching writer.
+        """
+        self.stop_collector()
+        self._stop_sender()
+        if self._influx_write is not None:
+            self._influx_write.close()
+            self._influx_write = None
+        if self._influx_client is not None:
+            self._influx_client.close()
+            self._influx_client = None
+        self._http.close()
+
     def _get_influxdb_config(self):
         """
         Get InfluxDB configuration.
         """
         return self.config.get("influxdb", {})
 
+    def _get_influx_write_api(self, url, token, org):
+        """
+        Return the shared batching InfluxDB write API, creating it on first use.
+        """
+        if self._influx_write is None:
+            self._influx_client = InfluxDBClient(url=url, token=token, org=org)
+            self._influx_write = self._influx_client.write_api(
+                write_options=WriteOptions(batch_size=500, flush_interval=10_000),
+                success_callback=self._on_influx_success,
+                error_callback=self._on_influx_error,
+            )
+        return self._influx_write
+
+    def _on_influx_success(self, conf, data):
+        """
+        Log a background batch write that InfluxDB accepted.
+        `conf` is (bucket, org, precision); `data` is the line protocol sent.
+        """
+        lines = data.count(b"\n" if isinstance(data, bytes) else "\n") + 1
+        self.logger.info(
+            {"event": "metrics_written_influxdb", "bucket": conf[0], "points": lines}
+        )
+
+    def _on_influx_error(self, conf, data, exception):
+        """
+        Log a failed background batch write to InfluxDB.
+        """
+        self.logger.error(
+            {"event": "influxdb_error", "bucket": conf[0], "error": str(exception)}
+        )
+
     def _format_point(self, metric_type, values, hostname, ts):
         """
         Format a single metric point for InfluxDB.
+        Uses a builder specialized for the shape of `values`, created the
+        first time that shape is seen.
+        """
+        cores = values.get("per_core_usage")
+        shape = (
+            metric_type,
+            tuple(values),
+            len(cores) if isinstance(cores, list) else None,
+        )
+        builder = self._point_builders.get(shape)
+        if builder is None:
+            builder = self._make_point_builder(metric_type, values)
+            self._point_builders[shape] = builder
+        return builder(values, hostname, ts)
+
+    @staticmethod
+    def _make_point_builder(metric_type, values):
+        """
+        Build a Point factory for one metric shape, with the field names
+        and per-core field names resolved up front. Value types are still
+        checked on every call, so a non-numeric value is skipped like in
+        the generic path instead of failing the whole write.
         """
-        point = Point(metric_type).tag("host", hostname).time(ts)
-        for k, v in values.items():
-            if k == "per_core_usage" and isinstance(v, list):
-                for i, core_usage in enumerate(v):
-                    point = point.field(f"core_{i}", float(core_usage))
-            elif isinstance(v, (int, float)):
-                point = point.field(k, float(v))
-        return point
+        scalar_keys = tuple(k for k in values if k != "per_core_usage")
+        cores = values.get("per_core_usage")
+        core_fields = (
+            tuple(f"core_{i}" for i in range(len(cores)))
+            if isinstance(cores, list)
+            else ()
+        )
+
+        def build(values, hostname, ts):
+            point = Point(metric_type).tag("host", hostname).time(ts)
+            for k in scalar_keys:
+                v = values[k]
+                if isinstance(v, (int, float)):
+                    point.field(k, float(v))
+            if core_fields:
+                for name, usage in zip(core_fields, values["per_core_usage"]):
+                    point.field(name, float(usage))
+            return point
+
+        return build
 
     def _format_disk_points(self, values, hostname, ts):
         """
@@ -179,37 +625,196 @@ class MetricCollector:
             )
             return
         try:
-            with InfluxDBClient(url=url, token=token, org=org) as client:
-                write_api = client.write_api(write_options=SYNCHRONOUS)
-                ts = datetime.now(timezone.utc)
-                hostname = socket.gethostname()
-                for metric_type, values in metrics.items():
-                    if metric_type == "disk":
-                        points = self._format_disk_points(values, hostname, ts)
-                        write_api.write(bucket=bucket, org=org, record=points)
-                    elif isinstance(values, dict):
-                        point = self._format_point(metric_type, values, hostname, ts)
-                        write_api.write(bucket=bucket, org=org, record=point)
-                    # else: skip floats like "cpu", "memory", "disk_max_percent"
-                self.logger.info(
-                    {"event": "metrics_written_influxdb", "bucket": bucket}
-                )
+            write_api = self._get_influx_write_api(url, token, org)
+            # Integer epoch nanoseconds match the client's default NS write
+            # precision, so Point serializes them without datetime arithmetic
+            ts = time.time_ns()
+            hostname = self._hostname
+            points = []
+            for metric_type, values in metrics.items():
+                if metric_type == "disk":
+                    points.extend(self._format_disk_points(values, hostname, ts))
+                elif isinstance(values, dict):
+                    points.append(self._format_point(metric_type, values, hostname, ts))
+                # else: skip floats like "cpu", "memory", "disk_max_percent"
+            # The batching writer only buffers here; the flush outcome is
+            # logged by _on_influx_success / _on_influx_error
+            write_api.write(bucket=bucket, org=org, record=points)
+            self.logger.debug(
+                {
+                    "event": "metrics_queued_influxdb",
+                    "bucket": bucket,
+                    "points": len(points),
+                }
+            )
         except Exception as e:
             self.logger.error({"event": "influxdb_error", "error": str(e)})
 
-    def _collect_and_send_metrics(self):
+    def _offer_handoff(self, item) -> None:
         """
-        Collect all metrics, send them to the configured endpoints,
-        and check for alert thresholds.
+        Put a sample (or _STOP) in the one-slot handoff queue, replacing an
+        older sample the shipping loop has not picked up yet.
+        Callers hold _latest_lock, so only the consumer races with this.
         """
-        cpu = self.collect_cpu_metrics()
-        memory = self.collect_memory_metrics()
-        disk = self.collect_disk_metrics()
-        metrics = {
-            "cpu": cpu,
-            "memory": memory,
-            "disk": disk,
-        }
+        try:
+            self._handoff.put_nowait(item)
+        except queue.Full:
+            try:
+                dropped = self._handoff.get_nowait()
+            except queue.Empty:
+                dropped = None
+            if dropped is not None and dropped is not _STOP:
+                self.logger.warning(
+                    {"event": "sample_dropped", "reason": "shipping_behind"}
+                )
+            self._handoff.put_nowait(item)
+
+    def _store_latest_metrics(self, metrics: Dict[str, Any]) -> None:
+        """
+        Publish a sample for latest_metrics() and hand it to the shipping
+        loop.
+        """
+        with self._latest_lock:
+            self._latest = metrics
+            self._offer_handoff(metrics)
+
+    def latest_metrics(self) -> Dict[str, Any]:
+        """
+        Return the most recent sample from the background collector,
+        or None if it has not produced one yet.
+        """
+        with self._latest_lock:
+            return self._latest
+
+    def _collect_with_retries(self):
+        """
+        Collect one snapshot, retrying up to 3 times with backoff.
+        Returns None if every attempt failed or stop_collector() was called
+        while waiting to retry.
+        """
+        for attempt in range(1, 4):
+            try:
+                return self.collect_all()
+            except Exception as e:
+                self.logger.error(
+                    {"event": "collection_error", "error": str(e), "attempt": attempt}
+                )
+                if attempt == 3:
+                    self.logger.error(
+                        {"event": "max_retries_exceeded", "error": str(e)}
+                    )
+                    return None
+                if self._stop_event.wait(self._retry_delay(attempt)):
+                    return None
+
+    def _collector_loop(self, interval) -> None:
+        """
+        Background thread body: sample metrics on a monotonic grid and hand
+        each sample to the shipping loop until stop_collector() is called.
+        The first sample is taken one interval after start, so its CPU usage
+        covers a full window rather than the moments since priming.
+        Always ends by handing over _STOP, so the shipping loop exits too.
+        """
+        deadline = time.monotonic()
+        try:
+            while True:
+                deadline = self._next_deadline(deadline, interval)
+                if self._stop_event.wait(max(0.0, deadline - time.monotonic())):
+                    return
+                metrics = self._collect_with_retries()
+                if metrics is not None:
+                    self._store_latest_metrics(metrics)
+        finally:
+            with self._latest_lock:
+                self._offer_handoff(_STOP)
+
+    def start_collector(self, interval: int = None) -> None:
+        """
+        Start sampling metrics on a background daemon thread, so slow
+        sends or alert delivery never delay the next sample. Samples are
+        handed over one at a time; see monitor_periodically.
+        """
+        if self._collector_thread is not None:
+            return
+        if interval is None:
+            interval = self.interval
+        self._stop_event.clear()
+        # Discard anything left over from a previous run, e.g. its _STOP
+        with self._latest_lock:
+            try:
+                self._handoff.get_nowait()
+            except queue.Empty:
+                pass
+        thread = threading.Thread(
+            target=self._collector_loop,
+            args=(interval,),
+            name="MetricCollectorSampler",
+            daemon=True,
+        )
+        thread.start()
+        self._collector_thread = thread
+
+    def stop_collector(self) -> None:
+        """
+        Stop the background collector thread if it is running.
+        """
+        thread = self._collector_thread
+        if thread is None:
+            return
+        self._stop_event.set()
+        thread.join(timeout=5)
+        self._collector_thread = None
+
+    def stop(self) -> None:
+        """
+        Ask monitor_periodically to stop, from any thread and at any time,
+        including before the loop has started. A stopped collector stays
+        stopped; create a new one to monitor again.
+        """
+        self._shutdown.set()
+        self.stop_collector()
+
+    def _should_ship(self, metrics: Dict[str, Any]) -> bool:
+        """
+        Decide whether this sample is worth sending downstream.
+        With metrics.min_change > 0, samples whose CPU, memory and per-disk
+        percentages all moved less than min_change points since the last
+        shipped sample are skipped, except that every MAX_SKIPPED_CYCLES-th
+        cycle is shipped anyway so dashboards never go stale.
+        """
+        if self.min_change <= 0:
+            return True
+        summary = (
+            metrics["cpu"]["cpu_usage"],
+            metrics["memory"]["percent"],
+            {mount: d["percent"] for mount, d in metrics["disk"].items()},
+        )
+        last = self._last_shipped
+        if (
+            last is None
+            or self._skipped_cycles >= self.MAX_SKIPPED_CYCLES
+            or abs(summary[0] - last[0]) >= self.min_change
+            or abs(summary[1] - last[1]) >= self.min_change
+            or summary[2].keys() != last[2].keys()
+            or any(
+                abs(percent - last[2][mount]) >= self.min_change
+                for mount, percent in summary[2].items()
+            )
+        ):
+            self._last_shipped = summary
+            self._skipped_cycles = 0
+            return True
+        self._skipped_cycles += 1
+        return False
+
+    def _ship_metrics(self, metrics: Dict[str, Any]) -> None:
+        """
+        Check one sample against the alert thresholds and send it to the
+        configured endpoints.
+        """
+        cpu = metrics["cpu"]
+        memory = metrics["memory"]
+        disk = metrics["disk"]
         # Alerting: check thresholds and trigger alerts if needed
         alerts.check_thresholds(
             {
@@ -218,20 +823,44 @@ class MetricCollector:
                 "disk": max((d["percent"] for d in disk.values()), default=0),
             },
             self.config,
+            {"hostname": self._hostname},
+            thresholds=self.alert_thresholds,
         )
-        self.send_metrics(metrics)
-        self.write_metrics_influxdb(metrics)
+        if self._should_ship(metrics):
+            self.send_metrics(metrics)
+            self.write_metrics_influxdb(metrics)
 
-    def monitor_periodically(self, interval: int = None) -> None:
+    def _collect_and_send_metrics(self):
         """
-        Periodically collect and print system metrics every `interval` seconds.
-        Press Ctrl+C to stop.
-        Interval is loaded from config.yaml if not provided.
-        Logs metrics and errors in structured JSON format.
-        Retries metric collection up to 3 times on error.
+        Collect all metrics inline and ship them. Used by the asyncio
+        variant, which has no sampler thread.
+        """
+        self._ship_metrics(self.collect_all())
+
+    def _retry_delay(self, attempt: int) -> float:
+        """
+        Exponential backoff with jitter before retry number `attempt` + 1,
+        so many collectors don't retry against an outage in lockstep.
+        """
+        delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** (attempt - 1))
+        return delay + random.uniform(0, self.RETRY_JITTER)
+
+    @staticmethod
+    def _next_deadline(deadline: float, interval: float) -> float:
+        """
+        Advance a monotonic deadline by one interval so ticks stay on a
+        fixed grid instead of drifting by the collection time. If a cycle
+        overran the next tick, realign to now rather than firing a burst
+        of catch-up cycles.
+        """
+        deadline += interval
+        now = time.monotonic()
+        return deadline if deadline > now else now
+
+    def _log_start_monitoring(self, interval) -> None:
+        """
+        Log the monitoring settings at startup.
         """
-        if interval is None:
-            interval = self.interval
         self.logger.info(
             {
                 "event": "start_monitoring",
@@ -244,11 +873,96 @@ class MetricCollector:
                 },
             }
         )
+
+    def _default_cache_ttl(self, interval) -> None:
+        """
+        When metrics.cache_ttl is unset, reuse samples for just under the
+        interval, so other readers between ticks get the last sample.
+        An explicit 0 keeps caching disabled.
+        """
+        if self.cache_ttl is None:
+            self.cache_ttl = max(0.0, interval - 0.1)
+
+    def _apply_scheduling(self) -> None:
+        """
+        Apply the optional metrics.nice and metrics.cpu_affinity settings to
+        this process, so the monitor yields CPU to the workloads it measures.
+        cpu_affinity takes a list of CPU ids or a single id. Both default to
+        off; unsupported platforms, bad values and permission errors are
+        logged and ignored.
+        """
+        metrics_conf = self.config.get("metrics", {})
+        niceness = metrics_conf.get("nice", 0)
+        affinity = metrics_conf.get("cpu_affinity")
+        if isinstance(affinity, int):
+            affinity = [affinity]
+        try:
+            if niceness:
+                os.nice(niceness)
+            if affinity is not None and hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(0, set(affinity))
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning({"event": "scheduling_not_applied", "error": str(e)})
+            return
+        if niceness or affinity is not None:
+            self.logger.info(
+                {"event": "scheduling_applied", "nice": niceness, "cpus": affinity}
+            )
+
+    def monitor_periodically(self, interval: int = None) -> None:
+        """
+        Periodically collect and print system metrics every `interval` seconds.
+        Sampling runs on a background thread (see start_collector), which
+        retries collection up to 3 times on error; this loop blocks on the
+        handoff queue and ships each sample once, checking alerts.
+        Press Ctrl+C, or call stop() from another thread, to stop.
+        Interval is loaded from config.yaml if not provided.
+        Logs metrics and errors in structured JSON format.
+        """
+        if interval is None:
+            interval = self.interval
+        self._default_cache_ttl(interval)
+        self._log_start_monitoring(interval)
+        try:
+            self._apply_scheduling()
+            self.start_collector(interval)
+            # stop() either finds the sampler running, whose exit hands over
+            # _STOP, or has already set _shutdown before this check
+            while not self._shutdown.is_set():
+                metrics = self._handoff.get()
+                if metrics is _STOP:
+                    break
+                try:
+                    self._ship_metrics(metrics)
+                except Exception as e:
+                    self.logger.error({"event": "shipping_error", "error": str(e)})
+        except KeyboardInterrupt:
+            self.logger.info({"event": "stopped"})
+        finally:
+            self.close()
+
+    async def monitor_periodically_async(self, interval: int = None) -> None:
+        """
+        Asyncio variant of monitor_periodically for running inside an
+        existing event loop (e.g. as a task alongside the FastAPI app).
+        Blocking collection and sending run in the default executor.
+        Cancel the task to stop.
+        """
+        if interval is None:
+            interval = self.interval
+        loop = asyncio.get_running_loop()
+        self._default_cache_ttl(interval)
+        self._log_start_monitoring(interval)
+        deadline = time.monotonic()
         try:
             while True:
+                # Sleep first: the first CPU sample needs a full interval
+                # since priming to report real usage
+                deadline = self._next_deadline(deadline, interval)
+                await asyncio.sleep(max(0.0, deadline - time.monotonic()))
                 for attempt in range(1, 4):
                     try:
-                        self._collect_and_send_metrics()
+                        await loop.run_in_executor(None, self._collect_and_send_metrics)
                         break
                     except Exception as e:
                         self.logger.error(
@@ -266,34 +980,23 @@ class MetricCollector:
                                 }
                             )
                         else:
-                            time.sleep(2)
-                time.sleep(interval)
-        except KeyboardInterrupt:
+                            await asyncio.sleep(self._retry_delay(attempt))
+        except asyncio.CancelledError:
             self.logger.info({"event": "stopped"})
-
-
-class JSONLogFormatter(logging.Formatter):
-    def format(self, record):
-        log_record = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "level": record.levelname,
-            "message": record.getMessage(),
-        }
-        # If the message is a dict, merge it
-        if isinstance(record.msg, dict):
-            log_record.update(record.msg)
-        return json.dumps(log_record)
+            raise
+        finally:
+            await loop.run_in_executor(None, self.close)
 
 
 if __name__ == "__main__":
     # Example usage: print metrics once
     collector = MetricCollector()
+    # CPU usage is measured since priming in __init__; give it a window
+    time.sleep(1)
     collector.logger.info(
         {
             "event": "single_collection",
-            "cpu": collector.collect_cpu_metrics(),
-            "memory": collector.collect_memory_metrics(),
-            "disk": collector.collect_disk_metrics(),
+            **collector.collect_all(),
         }
     )
     # Uncomment below to run periodic monitoring
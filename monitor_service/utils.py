@@ -1,15 +1,36 @@
 """Utility functions for the monitoring service."""
 
+import copy
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
+import orjson
 import yaml
 
+# Prefer the libyaml-backed C loader when PyYAML was built with it
+_YAMLLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Parsed configs keyed by absolute path, stored with the file signature
+# (mtime_ns, size, inode) they were read from. Oldest entries are evicted
+# once the cache grows past _CONFIG_CACHE_MAXSIZE.
+_CONFIG_CACHE_MAXSIZE = 16
+_config_cache: "OrderedDict[str, Tuple[Tuple[int, int, int], Any]]" = OrderedDict()
+_config_cache_lock = threading.Lock()
+
 
 def load_config(path: str = "config.yaml") -> Dict[str, Any]:
     """
     Load configuration from a YAML file.
 
+    Parsed results are cached per absolute path and reused until the file's
+    mtime, size or inode changes. Each call returns a deep copy, so callers
+    may mutate the result freely.
+
     Args:
         path: Path to the configuration file
 
@@ -22,11 +43,61 @@ def load_config(path: str = "config.yaml") -> Dict[str, Any]:
     """
     config_path = Path(path)
 
-    if not config_path.exists():
+    try:
+        st = os.stat(config_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found: {path}")
 
+    key = os.path.abspath(config_path)
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    with _config_cache_lock:
+        cached = _config_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            _config_cache.move_to_end(key)
+            return copy.deepcopy(cached[1])
+
     try:
         with open(config_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
+            config = yaml.load(f, Loader=_YAMLLoader)
     except yaml.YAMLError as e:
         raise yaml.YAMLError(f"Error parsing configuration file {path}: {e}")
+
+    with _config_cache_lock:
+        _config_cache[key] = (signature, config)
+        _config_cache.move_to_end(key)
+        while len(_config_cache) > _CONFIG_CACHE_MAXSIZE:
+            _config_cache.popitem(last=False)
+
+    return copy.deepcopy(config)
+
+
+def clear_config_cache() -> None:
+    """Drop all cached configurations, forcing the next load to re-read disk."""
+    with _config_cache_lock:
+        _config_cache.clear()
+
+
+class JSONLogFormatter(logging.Formatter):
+    """
+    Format log records as single-line JSON with a UTC timestamp and level.
+    Dict messages are merged into the record; other messages go under
+    "message".
+    """
+
+    def format(self, record):
+        timestamp = datetime.fromtimestamp(record.created, tz=timezone.utc)
+        # Dict messages are merged as-is, skipping the str() of getMessage()
+        if isinstance(record.msg, dict):
+            log_record = {
+                "timestamp": timestamp.isoformat(),
+                "level": record.levelname,
+                **record.msg,
+            }
+        else:
+            log_record = {
+                "timestamp": timestamp.isoformat(),
+                "level": record.levelname,
+                "message": record.getMessage(),
+            }
+        return orjson.dumps(log_record, option=orjson.OPT_NON_STR_KEYS).decode()
@@ -81,7 +81,7 @@ def test_cooldown_prevents_alert(monkeypatch, alerting_config):
 
 
 def test_send_slack_alert(monkeypatch, alerting_config):
-    with patch("monitor_service.alerts.requests.post") as mock_post:
+    with patch.object(alerts._session, "post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.text = "ok"
         alerts.send_slack_alert("test message", alerting_config["slack"])
@@ -99,3 +99,50 @@ def test_log_alert(monkeypatch):
     with patch("logging.warning") as mock_warn:
         alerts.log_alert("test log")
         mock_warn.assert_called_once_with("test log")
+
+
+def test_build_threshold_map(alerting_config):
+    thresholds = alerts.build_threshold_map(alerting_config)
+    assert thresholds == {"cpu": 90, "memory": 80, "disk": 80}
+
+
+def test_precomputed_thresholds_are_used(monkeypatch, alerting_config):
+    alerts._last_alert_times = {}
+    triggered = {}
+
+    def fake_send_alert(msg, alerting):
+        triggered["called"] = True
+
+    monkeypatch.setattr(alerts, "send_alert", fake_send_alert)
+    # Config says 90, but the precomputed map wins
+    alerts.check_thresholds(
+        {"cpu": 60},
+        {"alerting": alerting_config},
+        {"hostname": "host"},
+        thresholds={"cpu": 50},
+    )
+    assert triggered.get("called")
+
+
+def test_unknown_metric_is_ignored(monkeypatch, alerting_config):
+    triggered = {}
+
+    def fake_send_alert(msg, alerting):
+        triggered["called"] = True
+
+    monkeypatch.setattr(alerts, "send_alert", fake_send_alert)
+    alerting_config["swap_threshold"] = 10
+    alerts.check_thresholds(
+        {"swap": 95}, {"alerting": alerting_config}, {"hostname": "host"}
+    )
+    assert not triggered.get("called", False)
+
+
+def test_no_hostname_lookup_below_threshold(monkeypatch, alerting_config):
+    import socket
+
+    def fail_gethostname():
+        raise AssertionError("hostname looked up with nothing to alert")
+
+    monkeypatch.setattr(socket, "gethostname", fail_gethostname)
+    alerts.check_thresholds({"cpu": 10, "memory": 10}, {"alerting": alerting_config})
@@ -1,44 +1,86 @@
 import socket
-from datetime import datetime, timezone
+from types import SimpleNamespace
 
+import orjson
+import pytest
 from fastapi.testclient import TestClient
 
+from monitor_service import cloud_ingestion
 from monitor_service.cloud_ingestion import app
 
+# Any ISO-8601 timestamp will do; the API only logs it
+TIMESTAMP = "2024-01-01T00:00:00+00:00"
+HOSTNAME = socket.gethostname()
+
+# Fields every health response must carry; a failing check shows the missing ones
+HEALTH_FIELDS = frozenset({"status", "timestamp", "version", "uptime"})
+DETAILED_HEALTH_FIELDS = HEALTH_FIELDS | {"system_info", "memory_usage", "disk_usage"}
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# A complete metrics payload, built once at import
+BASE_PAYLOAD = {
+    "timestamp": TIMESTAMP,
+    "hostname": HOSTNAME,
+    "metrics": {
+        "cpu": {
+            "cpu_usage": 10,
+            "cpu_count": 4,
+            "per_core_usage": [10, 10, 10, 10],
+        },
+        "memory": {"total_gb": 8, "used_gb": 4, "free_gb": 4, "percent": 50},
+        "disk": {"/": {"total_gb": 100, "used_gb": 50, "free_gb": 50, "percent": 50}},
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Fixture to provide one TestClient shared by every test in this module."""
+    with TestClient(app) as c:
+        yield c
+
 
-def test_receive_metrics():
+@pytest.fixture(scope="module")
+def detailed_health(client):
+    """Fixture to fetch /health/detailed once for the tests that inspect it."""
+    return client.get("/health/detailed")
+
+
+def test_receive_metrics(client):
     """
     Test that the /api/metrics endpoint accepts a valid payload and returns status ok.
     """
-    client = TestClient(app)
-    payload = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "hostname": socket.gethostname(),
-        "metrics": {
-            "cpu": {
-                "cpu_usage": 10,
-                "cpu_count": 4,
-                "per_core_usage": [10, 10, 10, 10],
-            },
-            "memory": {"total_gb": 8, "used_gb": 4, "free_gb": 4, "percent": 50},
-            "disk": {
-                "/": {"total_gb": 100, "used_gb": 50, "free_gb": 50, "percent": 50}
-            },
-        },
-    }
-    response = client.post("/api/metrics", json=payload)
+    # Post orjson bytes, the same encoding MetricCollector sends
+    response = client.post(
+        "/api/metrics", content=orjson.dumps(BASE_PAYLOAD), headers=JSON_HEADERS
+    )
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "ok"
     assert "received_at" in data
-    assert data["hostname"] == payload["hostname"]
+    assert data["hostname"] == HOSTNAME
 
 
-def test_root_endpoint():
+def test_receive_metrics_batch(client):
+    """
+    Test that the /api/metrics/batch endpoint accepts a list of payloads.
+    """
+    response = client.post(
+        "/api/metrics/batch",
+        content=orjson.dumps([BASE_PAYLOAD, BASE_PAYLOAD]),
+        headers=JSON_HEADERS,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["count"] == 2
+
+
+def test_root_endpoint(client):
     """
     Test that the root endpoint returns API information.
     """
-    client = TestClient(app)
     response = client.get("/")
     assert response.status_code == 200
     data = response.json()
@@ -49,137 +91,71 @@ def test_root_endpoint():
     assert "metrics" in data["endpoints"]
 
 
-def test_health_check():
+@pytest.mark.parametrize(
+    "path,expected_status",
+    [("/health", "healthy"), ("/health/ready", "ready"), ("/health/live", "alive")],
+)
+def test_health_probes(client, path, expected_status):
     """
-    Test basic health check endpoint.
+    Test the basic health, readiness and liveness endpoints.
     """
-    client = TestClient(app)
-    response = client.get("/health")
+    response = client.get(path)
     assert response.status_code == 200
     data = response.json()
-    assert data["status"] == "healthy"
+    assert data["status"] == expected_status
     assert "timestamp" in data
     assert data["version"] == "1.0.0"
     assert "uptime" in data
     assert isinstance(data["uptime"], (int, float))
 
 
-def test_readiness_check():
+def test_detailed_health_check(detailed_health):
     """
-    Test readiness check endpoint.
+    Test that the detailed health check returns the status, basic information
+    and the system_info, memory_usage and disk_usage sections.
     """
-    client = TestClient(app)
-    response = client.get("/health/ready")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "ready"
-    assert "timestamp" in data
-    assert data["version"] == "1.0.0"
-    assert "uptime" in data
-
-
-def test_liveness_check():
-    """
-    Test liveness check endpoint.
-    """
-    client = TestClient(app)
-    response = client.get("/health/live")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "alive"
-    assert "timestamp" in data
-    assert data["version"] == "1.0.0"
-    assert "uptime" in data
-
-
-def test_detailed_health_check_status_and_basic_info():
-    """
-    Test that the detailed health check
-    returns the correct status and basic information.
-    """
-    client = TestClient(app)
-    response = client.get("/health/detailed")
-    assert response.status_code == 200
-    data = response.json()
+    assert detailed_health.status_code == 200
+    data = detailed_health.json()
     assert data["status"] == "healthy"
     assert "timestamp" in data
     assert data["version"] == "1.0.0"
     assert "uptime" in data
+    for field in ("hostname", "platform", "cpu_count", "cpu_percent"):
+        assert field in data["system_info"]
+    for section in ("memory_usage", "disk_usage"):
+        for field in ("total_gb", "used_gb", "percent"):
+            assert field in data[section]
 
 
-def test_detailed_health_check_system_info():
-    """
-    Test the structure and content of the system_info field
-    in the detailed health check.
-    """
-    client = TestClient(app)
-    response = client.get("/health/detailed")
-    assert response.status_code == 200
-    data = response.json()
-    assert "system_info" in data
-    system_info = data["system_info"]
-    assert "hostname" in system_info
-    assert "platform" in system_info
-    assert "cpu_count" in system_info
-    assert "cpu_percent" in system_info
-
-
-def test_detailed_health_check_memory_usage():
+def test_health_check_response_model(client, detailed_health):
     """
-    Test the structure and content of the memory_usage field
-    in the detailed health check.
+    Test that health check responses match the expected Pydantic model structure.
     """
-    client = TestClient(app)
-    response = client.get("/health/detailed")
-    assert response.status_code == 200
-    data = response.json()
-    assert "memory_usage" in data
-    memory_usage = data["memory_usage"]
-    assert "total_gb" in memory_usage
-    assert "used_gb" in memory_usage
-    assert "percent" in memory_usage
-
+    # Test basic health check model
+    data = client.get("/health").json()
+    assert not HEALTH_FIELDS - data.keys()
 
-def test_detailed_health_check_disk_usage():
-    """
-    Test the structure and content of the disk_usage field
-    in the detailed health check.
-    """
-    client = TestClient(app)
-    response = client.get("/health/detailed")
-    assert response.status_code == 200
-    data = response.json()
-    assert "disk_usage" in data
-    disk_usage = data["disk_usage"]
-    assert "total_gb" in disk_usage
-    assert "used_gb" in disk_usage
-    assert "percent" in disk_usage
+    # Test detailed health check model
+    data = detailed_health.json()
+    assert not DETAILED_HEALTH_FIELDS - data.keys()
 
 
-def test_health_check_response_model():
+def test_health_probes_share_cached_snapshot(client, monkeypatch):
     """
-    Test that health check responses match the expected Pydantic model structure.
+    Test that probes within HEALTH_CACHE_TTL reuse the same cached snapshot,
+    and that it is refreshed once the TTL has passed.
     """
-    client = TestClient(app)
+    clock = {"now": 1000.0}
+    # Patch only the module's view of the clock; the event loop keeps real time
+    monkeypatch.setattr(
+        cloud_ingestion, "time", SimpleNamespace(monotonic=lambda: clock["now"])
+    )
+    monkeypatch.setitem(cloud_ingestion._health_cache, "refreshed_at", float("-inf"))
+    health = client.get("/health").json()
+    live = client.get("/health/live").json()
+    assert health["timestamp"] == live["timestamp"]
+    assert live["status"] == "alive"
 
-    # Test basic health check model
-    response = client.get("/health")
-    data = response.json()
-    required_fields = ["status", "timestamp", "version", "uptime"]
-    for field in required_fields:
-        assert field in data
-
-    # Test detailed health check model
-    response = client.get("/health/detailed")
-    data = response.json()
-    required_fields = [
-        "status",
-        "timestamp",
-        "version",
-        "uptime",
-        "system_info",
-        "memory_usage",
-        "disk_usage",
-    ]
-    for field in required_fields:
-        assert field in data
+    clock["now"] += cloud_ingestion.HEALTH_CACHE_TTL + 0.1
+    assert client.get("/health/ready").json()["uptime"] >= health["uptime"]
+    assert cloud_ingestion._health_cache["refreshed_at"] == clock["now"]
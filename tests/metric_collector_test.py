@@ -6,9 +6,28 @@ These tests verify:
 - Robust error handling and retry logic in periodic monitoring.
 """
 
+import asyncio
+import operator
+import os
+import threading
+import time
+from collections import namedtuple
+from unittest.mock import patch
+
+import orjson
+import psutil
 import pytest
 
-from monitor_service.metric_collector import MetricCollector
+from monitor_service.metric_collector import (
+    MetricCollector,
+    _cpu_busy_percent,
+    _disk_usage,
+    _percpu_cpu_times,
+)
+
+# Types accepted for percentage values, hoisted so isinstance() reuses one tuple
+NUMERIC = (int, float)
+DISK_FIELDS = frozenset({"total_gb", "used_gb", "free_gb", "percent"})
 
 
 @pytest.fixture
@@ -24,7 +43,7 @@ def test_collect_cpu_metrics(collector):
     assert "cpu_usage" in cpu
     assert "cpu_count" in cpu
     assert "per_core_usage" in cpu
-    assert isinstance(cpu["cpu_usage"], (int, float))
+    assert isinstance(cpu["cpu_usage"], NUMERIC)
     assert isinstance(cpu["cpu_count"], int)
     assert isinstance(cpu["per_core_usage"], list)
 
@@ -38,25 +57,406 @@ def test_collect_memory_metrics(collector):
     assert isinstance(mem["total_gb"], float)
     assert isinstance(mem["used_gb"], float)
     assert isinstance(mem["free_gb"], float)
-    assert isinstance(mem["percent"], (int, float))
+    assert isinstance(mem["percent"], NUMERIC)
+
+
+def test_collect_all(collector):
+    """Test that collect_all returns one snapshot of every metric group."""
+    metrics = collector.collect_all()
+    assert set(metrics) == {"cpu", "memory", "disk"}
+    assert "cpu_usage" in metrics["cpu"]
+    assert "percent" in metrics["memory"]
+
 
+def test_collect_process_metrics(collector):
+    """Test that collect_process_metrics reports on the current process."""
+    proc = collector.collect_process_metrics()
+    assert proc["pid"] == os.getpid()
+    assert isinstance(proc["cpu_percent"], float)
+    assert isinstance(proc["rss_gb"], float)
+    assert proc["num_threads"] >= 1
 
-def test_collect_disk_metrics_structure(collector):
-    """Test that collect_disk_metrics returns a dictionary of dictionaries."""
+
+def test_collect_process_metrics_explicit_pid(collector):
+    """Test that an explicit pid reuses a primed handle and reports CPU use."""
+    deadline = time.process_time() + 0.2
+    while time.process_time() < deadline:
+        pass
+    proc = collector.collect_process_metrics(os.getpid())
+    assert proc["pid"] == os.getpid()
+    assert proc["cpu_percent"] > 0.0
+    handle = collector._processes[os.getpid()]
+    collector.collect_process_metrics(os.getpid())
+    assert collector._processes[os.getpid()] is handle
+
+
+def test_collect_disk_metrics(collector):
+    """Test that collect_disk_metrics returns per-mount dicts of typed fields."""
     disk = collector.collect_disk_metrics()
     assert isinstance(disk, dict)
     assert disk, "Disk metrics should not be empty"
+    get_fields = operator.itemgetter("total_gb", "used_gb", "free_gb", "percent")
     for mount, info in disk.items():
-        assert isinstance(info, dict)
+        assert isinstance(info, dict), mount
+        assert not DISK_FIELDS - info.keys(), mount
+        total, used, free, percent = get_fields(info)
+        assert all(isinstance(v, float) for v in (total, used, free)), mount
+        assert isinstance(percent, NUMERIC), mount
 
 
-def test_collect_disk_metrics_fields(collector):
-    """Test that each disk metric has the expected fields and value types."""
-    disk = collector.collect_disk_metrics()
-    for mount, info in disk.items():
-        for key in ["total_gb", "used_gb", "free_gb", "percent"]:
-            assert key in info
-        assert isinstance(info["total_gb"], float)
-        assert isinstance(info["used_gb"], float)
-        assert isinstance(info["free_gb"], float)
-        assert isinstance(info["percent"], (int, float))
+def test_disk_partitions_are_cached(collector, monkeypatch):
+    """Test that partitions are listed once per PARTITIONS_TTL window."""
+    calls = {"count": 0}
+    real_disk_partitions = psutil.disk_partitions
+
+    def counting_disk_partitions(*args, **kwargs):
+        calls["count"] += 1
+        return real_disk_partitions(*args, **kwargs)
+
+    monkeypatch.setattr(psutil, "disk_partitions", counting_disk_partitions)
+    collector.collect_disk_metrics()
+    collector.collect_disk_metrics()
+    assert calls["count"] == 1
+
+
+def test_monitor_periodically_stops_on_stop(collector, monkeypatch):
+    """Test that stop() wakes and ends the blocking monitor loop."""
+    monkeypatch.setattr(MetricCollector, "_ship_metrics", lambda self, metrics: None)
+    started = threading.Event()
+    real_start_collector = MetricCollector.start_collector
+
+    def start_collector(self, interval=None):
+        real_start_collector(self, interval)
+        started.set()
+
+    monkeypatch.setattr(MetricCollector, "start_collector", start_collector)
+    thread = threading.Thread(target=collector.monitor_periodically, args=(60,))
+    thread.start()
+    assert started.wait(timeout=5)
+    collector.stop()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_stop_before_monitor_starts_is_kept(collector):
+    """Test that a stop() requested before the loop starts is not lost."""
+    collector.stop()
+    thread = threading.Thread(target=collector.monitor_periodically, args=(60,))
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_apply_scheduling_is_opt_in(collector, monkeypatch):
+    """Test that nice/affinity are only touched when configured."""
+    calls = []
+    monkeypatch.setattr(os, "nice", lambda inc: calls.append(("nice", inc)))
+    monkeypatch.setattr(
+        os, "sched_setaffinity", lambda pid, cpus: calls.append(("cpus", cpus))
+    )
+    collector._apply_scheduling()
+    assert calls == []
+    collector.config["metrics"].update({"nice": 10, "cpu_affinity": [0]})
+    collector._apply_scheduling()
+    assert calls == [("nice", 10), ("cpus", {0})]
+    calls.clear()
+    collector.config["metrics"].update({"nice": 0, "cpu_affinity": 1})
+    collector._apply_scheduling()
+    assert calls == [("cpus", {1})]
+    collector.config["metrics"]["cpu_affinity"] = 1.5
+    collector._apply_scheduling()  # logged, not raised
+
+
+def test_monitor_periodically_async_cancels_cleanly(collector, monkeypatch):
+    """Test that the async monitor collects each tick and stops on cancel."""
+    calls = {"count": 0}
+
+    def fake_collect(self):
+        calls["count"] += 1
+
+    monkeypatch.setattr(MetricCollector, "_collect_and_send_metrics", fake_collect)
+
+    async def run():
+        task = asyncio.ensure_future(collector.monitor_periodically_async(0.01))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert calls["count"] >= 2
+
+
+def test_retry_delay_backs_off_with_jitter(collector):
+    """Test that retry delays grow exponentially, are capped and jittered."""
+    jitter = collector.RETRY_JITTER
+    assert 2 <= collector._retry_delay(1) <= 2 + jitter
+    assert 4 <= collector._retry_delay(2) <= 4 + jitter
+    capped = collector.RETRY_MAX_DELAY
+    assert capped <= collector._retry_delay(10) <= capped + jitter
+
+
+def test_format_point_fields(collector):
+    """Test that InfluxDB points carry numeric and per-core fields."""
+    values = {"cpu_usage": 12.5, "cpu_count": 2, "per_core_usage": [10.0, 15.0]}
+    for _ in range(2):  # second call goes through the cached builder
+        line = collector._format_point("cpu", values, "host", None).to_line_protocol()
+        assert line.startswith("cpu,host=host ")
+        for field in ("cpu_usage=12.5", "cpu_count=2", "core_0=10", "core_1=15"):
+            assert field in line
+
+
+def test_format_point_skips_non_numeric_values(collector):
+    """Test that a cached builder skips values that are not numeric."""
+    collector._format_point("memory", {"percent": 50.0, "used_gb": 1.0}, "h", None)
+    line = collector._format_point(
+        "memory", {"percent": None, "used_gb": 2.0}, "h", None
+    ).to_line_protocol()
+    assert "used_gb=2" in line
+    assert "percent" not in line
+
+
+def test_influx_callbacks_log_flush_outcome(collector):
+    """Test that batch flush results are logged from the writer callbacks."""
+    conf = ("bucket", "org", "ns")
+    with patch.object(collector.logger, "info") as info:
+        collector._on_influx_success(conf, b"cpu a=1 1\nmemory b=2 1")
+    assert info.call_args.args[0] == {
+        "event": "metrics_written_influxdb",
+        "bucket": "bucket",
+        "points": 2,
+    }
+    with patch.object(collector.logger, "error") as error:
+        collector._on_influx_error(conf, b"cpu a=1 1", RuntimeError("down"))
+    assert error.call_args.args[0]["event"] == "influxdb_error"
+    assert error.call_args.args[0]["error"] == "down"
+
+
+def test_format_disk_points_use_ns_timestamp(collector):
+    """Test that integer nanosecond timestamps are written through as-is."""
+    ts = time.time_ns()
+    (point,) = collector._format_disk_points({"/": {"percent": 40.0}}, "host", ts)
+    line = point.to_line_protocol()
+    assert line.startswith("disk,host=host,mount=/ percent=40")
+    assert line.endswith(f" {ts}")
+
+
+def test_collector_ttl_cache(collector, monkeypatch):
+    """Test that collectors reuse results within cache_ttl and not without."""
+    calls = {"count": 0}
+    real_virtual_memory = psutil.virtual_memory
+
+    def counting_virtual_memory():
+        calls["count"] += 1
+        return real_virtual_memory()
+
+    monkeypatch.setattr(psutil, "virtual_memory", counting_virtual_memory)
+    collector.collect_memory_metrics()
+    collector.collect_memory_metrics()
+    assert calls["count"] == 2
+    collector.cache_ttl = 60
+    first = collector.collect_memory_metrics()
+    assert collector.collect_memory_metrics() is first
+    assert calls["count"] == 3
+
+
+def test_cache_ttl_defaults_only_when_unset(collector):
+    """Test that monitoring defaults an unset cache_ttl but keeps an explicit 0."""
+    assert collector.cache_ttl is None
+    collector._default_cache_ttl(10)
+    assert collector.cache_ttl == 9.9
+    collector.cache_ttl = 0
+    collector._default_cache_ttl(10)
+    assert collector.cache_ttl == 0
+
+
+def test_next_deadline_stays_on_grid(monkeypatch):
+    """Test that deadlines advance by interval and realign after overruns."""
+    monkeypatch.setattr(time, "monotonic", lambda: 100.5)
+    assert MetricCollector._next_deadline(100.0, 10) == 110.0
+    assert MetricCollector._next_deadline(80.0, 10) == 100.5
+
+
+def test_background_collector_publishes_latest(collector):
+    """Test that the background collector samples and stops cleanly."""
+    collector.start_collector(interval=0.05)
+    try:
+        first = collector._handoff.get(timeout=2)
+        assert set(first) == {"cpu", "memory", "disk"}
+        second = collector._handoff.get(timeout=2)
+        assert second is not first
+        assert collector.latest_metrics() is not first
+    finally:
+        collector.stop_collector()
+    assert collector._collector_thread is None
+
+
+def test_monitor_ships_each_sample_once(collector, monkeypatch):
+    """Test that every shipped sample is a distinct, fresh collection."""
+    shipped = []
+    monkeypatch.setattr(
+        MetricCollector, "_ship_metrics", lambda self, metrics: shipped.append(metrics)
+    )
+    thread = threading.Thread(target=collector.monitor_periodically, args=(0.05,))
+    thread.start()
+    deadline = time.monotonic() + 5
+    while len(shipped) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    collector.stop_collector()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert len(shipped) >= 4
+    assert len({id(m["memory"]) for m in shipped}) == len(shipped)
+
+
+def test_first_sample_waits_one_interval(collector):
+    """Test that the first sample covers a full interval, not the priming gap."""
+    started = time.monotonic()
+    collector.start_collector(interval=0.2)
+    try:
+        collector._handoff.get(timeout=2)
+        assert time.monotonic() - started >= 0.19
+    finally:
+        collector.stop_collector()
+
+
+def test_collection_is_retried_on_the_sampler_thread(collector, monkeypatch):
+    """Test that a transient collection error is retried, not fatal."""
+    real_collect_all = MetricCollector.collect_all
+    calls = {"count": 0}
+
+    def flaky_collect_all(self):
+        calls["count"] += 1
+        if calls["count"] == 1:
+            raise RuntimeError("transient")
+        return real_collect_all(self)
+
+    monkeypatch.setattr(MetricCollector, "collect_all", flaky_collect_all)
+    monkeypatch.setattr(MetricCollector, "_retry_delay", lambda self, attempt: 0.01)
+    collector.start_collector(interval=0.05)
+    try:
+        metrics = collector._handoff.get(timeout=2)
+        assert set(metrics) == {"cpu", "memory", "disk"}
+        assert calls["count"] == 2
+    finally:
+        collector.stop_collector()
+
+
+def test_collector_uses_slots(collector):
+    """Test that MetricCollector instances carry no per-instance __dict__."""
+    assert not hasattr(collector, "__dict__")
+
+
+def test_batched_sends_go_through_background_sender(collector):
+    """Test that batched payloads are posted together to the batch endpoint."""
+    collector.cloud_batch_size = 3
+    with patch.object(collector._http, "post") as mock_post:
+        mock_post.return_value.json.return_value = {"status": "ok"}
+        for _ in range(3):
+            collector.send_metrics({"cpu": {"cpu_usage": 1.0}})
+        collector.close()
+    assert mock_post.call_count == 1
+    assert len(orjson.loads(mock_post.call_args.kwargs["data"])) == 3
+    assert mock_post.call_args.args[0].endswith("/api/metrics/batch")
+
+
+def test_batched_sends_spaced_out_are_combined(collector):
+    """Test that payloads arriving one per cycle still share one POST."""
+    collector.cloud_batch_size = 3
+    collector.interval = 1
+    with patch.object(collector._http, "post") as mock_post:
+        mock_post.return_value.json.return_value = {"status": "ok"}
+        for _ in range(3):
+            collector.send_metrics({"cpu": {"cpu_usage": 1.0}})
+            time.sleep(0.1)
+        deadline = time.monotonic() + 2
+        while not mock_post.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert mock_post.call_count == 1
+        assert len(orjson.loads(mock_post.call_args.kwargs["data"])) == 3
+        collector.close()
+    assert mock_post.call_count == 1
+
+
+def test_partial_batch_is_flushed_after_max_delay(collector):
+    """Test that a partial batch is sent once batch_size * interval passes."""
+    collector.cloud_batch_size = 3
+    collector.interval = 0.05
+    with patch.object(collector._http, "post") as mock_post:
+        mock_post.return_value.json.return_value = {"status": "ok"}
+        collector.send_metrics({"cpu": {"cpu_usage": 1.0}})
+        deadline = time.monotonic() + 2
+        while not mock_post.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert mock_post.call_count == 1
+        assert len(orjson.loads(mock_post.call_args.kwargs["data"])) == 1
+        collector.close()
+
+
+def test_cpu_busy_percent_from_time_deltas():
+    """Test CPU usage computed from two cpu_times() samples."""
+    times = namedtuple("scputimes", "user system idle iowait guest")
+    prev = times(user=10, system=10, idle=70, iowait=10, guest=0)
+    cur = times(user=40, system=20, idle=120, iowait=20, guest=5)
+    # busy delta 40 over total delta 100 (guest is already counted in user)
+    assert _cpu_busy_percent(prev, cur) == 40.0
+    assert _cpu_busy_percent(cur, cur) == 0.0
+    # iowait going backwards is clamped per field instead of skewing the total
+    prev = times(user=10, system=10, idle=70, iowait=10, guest=0)
+    cur = times(user=12, system=10, idle=71, iowait=7, guest=0)
+    assert _cpu_busy_percent(prev, cur) == 66.7
+    # every counter regressed: no time elapsed, so no division by zero
+    assert _cpu_busy_percent(cur, prev) == 0.0
+
+
+def test_percpu_cpu_times_matches_psutil():
+    """Test that the direct /proc/stat reader agrees with psutil."""
+    direct = _percpu_cpu_times()
+    expected = psutil.cpu_times(percpu=True)
+    assert len(direct) == len(expected)
+    assert direct[0]._fields == expected[0]._fields
+    assert abs(direct[0].idle - expected[0].idle) < 5
+
+
+def test_disk_usage_matches_psutil():
+    """Test that the statvfs-based disk usage agrees with psutil."""
+    total, used, free, percent = _disk_usage("/")
+    expected = psutil.disk_usage("/")
+    assert total == expected.total
+    assert abs(used - expected.used) < 2**30
+    assert abs(percent - expected.percent) <= 0.5
+
+
+def test_should_ship_skips_unchanged_samples(collector):
+    """Test that near-identical samples are skipped when min_change is set."""
+
+    def sample(cpu):
+        return {
+            "cpu": {"cpu_usage": cpu},
+            "memory": {"percent": 50.0},
+            "disk": {"/": {"percent": 40.0}},
+        }
+
+    assert collector._should_ship(sample(10.0))
+    collector.min_change = 1.0
+    assert collector._should_ship(sample(10.0))
+    assert not collector._should_ship(sample(10.5))
+    assert collector._should_ship(sample(12.0))
+    for _ in range(collector.MAX_SKIPPED_CYCLES):
+        assert not collector._should_ship(sample(12.0))
+    assert collector._should_ship(sample(12.0))
+
+
+def test_bind_mounts_are_deduplicated(collector, monkeypatch):
+    """Test that only the first mountpoint of each device is kept."""
+    part = namedtuple("sdiskpart", "device mountpoint fstype opts")
+    parts = [
+        part("/dev/sda1", "/", "ext4", "rw"),
+        part("/dev/sda1", "/var/lib/bind", "ext4", "rw"),
+        part("/dev/sdb1", "/data", "xfs", "rw"),
+        part("tmpfs", "/run", "tmpfs", "rw"),
+    ]
+    monkeypatch.setattr(psutil, "disk_partitions", lambda all=False: parts)
+    assert collector._get_mountpoints() == ["/", "/data"]
@@ -0,0 +1,62 @@
+"""
+Unit tests for helpers in monitor_service.utils.
+"""
+
+import json
+import logging
+import os
+
+import pytest
+
+from monitor_service import utils
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Fixture to provide a small config file and a clean config cache."""
+    utils.clear_config_cache()
+    path = tmp_path / "config.yaml"
+    path.write_text("metrics:\n  interval: 10\n")
+    yield path
+    utils.clear_config_cache()
+
+
+def test_load_config_returns_isolated_copies(config_file):
+    """Test that mutating a loaded config does not leak into later loads."""
+    first = utils.load_config(str(config_file))
+    first["metrics"]["interval"] = 99
+    second = utils.load_config(str(config_file))
+    assert second["metrics"]["interval"] == 10
+
+
+def test_load_config_reloads_on_change(config_file):
+    """Test that the cache is invalidated when the file changes on disk."""
+    assert utils.load_config(str(config_file))["metrics"]["interval"] == 10
+    config_file.write_text("metrics:\n  interval: 30\n")
+    st = config_file.stat()
+    os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert utils.load_config(str(config_file))["metrics"]["interval"] == 30
+
+
+def test_load_config_missing_file(tmp_path):
+    """Test that a missing file raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        utils.load_config(str(tmp_path / "missing.yaml"))
+
+
+def test_json_log_formatter_merges_dict_messages():
+    """Test that dict messages are merged and string messages are kept."""
+    formatter = utils.JSONLogFormatter()
+    record = logging.LogRecord(
+        "t", logging.INFO, __file__, 1, {"event": "x"}, None, None
+    )
+    data = json.loads(formatter.format(record))
+    assert data["level"] == "INFO"
+    assert data["event"] == "x"
+    assert "message" not in data
+    record = logging.LogRecord(
+        "t", logging.WARNING, __file__, 1, "hi %s", ("you",), None
+    )
+    data = json.loads(formatter.format(record))
+    assert data["message"] == "hi you"
+    assert data["timestamp"].endswith("+00:00")